@@ -70,6 +70,11 @@ def main() -> int:
         action='store_true',
         help='Detect and skip duplicate elements based on content'
     )
+    parser.add_argument(
+        '--dedup-approximate',
+        action='store_true',
+        help='Back --deduplicate with a fixed-memory Bloom filter; may very rarely drop a non-duplicate'
+    )
     parser.add_argument(
         '--flatten',
         action='store_true',
@@ -81,6 +86,24 @@ def main() -> int:
         default=3,
         help='Maximum retry attempts for failed file processing (default: 3)'
     )
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=1,
+        help='Worker processes for parsing, 0 means one per CPU (default: 1)'
+    )
+    parser.add_argument(
+        '--aggregate-cache',
+        type=str,
+        default=None,
+        help='Shard file holding all inputs; built on the first run, replayed on later runs'
+    )
+    parser.add_argument(
+        '--fragment-cache',
+        type=str,
+        default=None,
+        help='Cache file of parsed fragments; unchanged inputs skip parsing on later runs'
+    )
 
     args = parser.parse_args()
 
@@ -93,8 +116,12 @@ def main() -> int:
         recursive=args.recursive,
         validate_schema=args.validate_schema,
         deduplicate=args.deduplicate,
+        approximate_dedup=args.dedup_approximate,
         preserve_structure=not args.flatten,
-        max_retries=args.max_retries
+        max_retries=args.max_retries,
+        jobs=args.jobs,
+        aggregate_cache=args.aggregate_cache,
+        fragment_cache=args.fragment_cache
     )
 
     if combiner.run():
@@ -14,6 +14,9 @@
 
 """Tests for the xml-combiner core module."""
 
+import json
+import os
+import shutil
 import xml.etree.ElementTree as ET
 from pathlib import Path
 
@@ -72,6 +75,16 @@ def test_element_hash_covers_text_and_children():
     assert element_hash(base) != element_hash(extra_child)
 
 
+def test_element_hash_covers_child_tails_but_not_the_elements_own():
+    base = ET.fromstring("<x><c/>AAA</x>")
+    other_tail = ET.fromstring("<x><c/>BBB</x>")
+    assert element_hash(base) != element_hash(other_tail)
+
+    tailed = ET.fromstring("<x><c/>AAA</x>")
+    tailed.tail = "between documents"
+    assert element_hash(base) == element_hash(tailed)
+
+
 # --- declared_encoding ------------------------------------------------------
 
 
@@ -82,6 +95,11 @@ def test_element_hash_covers_text_and_children():
         (b"<?xml version='1.0' encoding='ISO-8859-2'?><a/>", "ISO-8859-2"),
         (b'<?xml version="1.0"?><a/>', "utf-8"),
         (b"<a/>", "utf-8"),
+        (b"\xff\xfe" + "<a/>".encode("utf-16-le"), "utf-16-le"),
+        (b"\xfe\xff" + "<a/>".encode("utf-16-be"), "utf-16-be"),
+        ("<?xml version='1.0'?><a/>".encode("utf-16-le"), "utf-16-le"),
+        ("<?xml version='1.0'?><a/>".encode("utf-16-be"), "utf-16-be"),
+        (b"\xff\xfe\x00\x00" + "<a/>".encode("utf-32-le"), "utf-32-le"),
     ],
 )
 def test_declared_encoding(raw, expected):
@@ -120,6 +138,13 @@ def test_parse_roots_honors_the_declared_encoding_on_the_wrapper_path(tmp_path):
     assert roots[0].text == "Kopřiva"
 
 
+def test_parse_roots_reads_utf16_documents(tmp_path):
+    text = '<?xml version="1.0" encoding="utf-16"?><a>Kopřiva</a>'
+    roots, _ = parse_roots(write(tmp_path, "wide.xml", text, encoding="utf-16"))
+    assert [r.tag for r in roots] == ["a"]
+    assert roots[0].text == "Kopřiva"
+
+
 def test_parse_roots_strips_a_doctype_before_wrapping(tmp_path):
     text = '<?xml version="1.0"?><!DOCTYPE note SYSTEM "note.dtd">\n<one/>\n<two/>'
     roots, _ = parse_roots(write(tmp_path, "dt.xml", text))
@@ -156,6 +181,48 @@ def test_get_xml_files_walks_subdirectories_only_when_recursive(tmp_path):
     assert sorted(p.name for p in deep) == ["deep.xml", "top.xml"]
 
 
+def test_an_unreadable_subdirectory_does_not_stop_the_run(tmp_path, monkeypatch):
+    source = tmp_path / "in"
+    (source / "locked").mkdir(parents=True)
+    write(source, "top.xml", SINGLE_ROOT)
+    write(source / "locked", "hidden.xml", SINGLE_ROOT)
+
+    real_scandir = os.scandir
+
+    def scandir(path):
+        if Path(path).name == "locked":
+            raise PermissionError(13, "Permission denied", str(path))
+        return real_scandir(path)
+
+    monkeypatch.setattr(os, "scandir", scandir)
+    out = tmp_path / "out.xml"
+    combiner = XMLCombiner(str(source), str(out), recursive=True)
+    assert combiner.run() is True
+    assert combiner.processed_files == 1
+    assert [c.tag for c in ET.parse(out).getroot()] == ["root"]
+
+
+def test_the_walk_reads_directories_only_as_it_reaches_them(tmp_path, monkeypatch):
+    source = tmp_path / "in"
+    for sub in ("a", "b"):
+        (source / sub).mkdir(parents=True)
+        write(source / sub, f"{sub}.xml", SINGLE_ROOT)
+
+    scanned = []
+    real_scandir = os.scandir
+
+    def scandir(path):
+        scanned.append(Path(path).name)
+        return real_scandir(path)
+
+    monkeypatch.setattr(os, "scandir", scandir)
+    walker = XMLCombiner(str(source), str(tmp_path / "o.xml"), recursive=True)._iter_xml_files()
+    first = next(walker)
+    assert first.name == "a.xml"
+    assert "b" not in scanned
+    assert sorted(p.name for p in walker) == ["b.xml"]
+
+
 # --- combining --------------------------------------------------------------
 
 
@@ -174,6 +241,30 @@ def test_deduplicate_drops_identical_elements_across_files(tmp_path):
     assert [c.tag for c in root] == ["root"]
 
 
+def test_approximate_dedup_also_drops_identical_elements(tmp_path):
+    root = combine(
+        tmp_path,
+        {"a.xml": SINGLE_ROOT, "b.xml": SINGLE_ROOT},
+        deduplicate=True,
+        approximate_dedup=True,
+    )
+    assert [c.tag for c in root] == ["root"]
+
+
+def test_parallel_jobs_match_the_serial_output(tmp_path):
+    files = {"a.xml": SINGLE_ROOT, "m.xml": MULTI_ROOT, "ns.xml": NAMESPACED}
+    serial = combine(tmp_path, files)
+    parallel = combine(tmp_path, files, jobs=2)
+    assert ET.tostring(parallel) == ET.tostring(serial)
+
+
+def test_parallel_jobs_keep_text_between_roots(tmp_path):
+    files = {"a.xml": SINGLE_ROOT, "m.xml": "<one>first</one>MIDDLE<two>second</two>"}
+    serial = combine(tmp_path, files)
+    parallel = combine(tmp_path, files, jobs=2)
+    assert ET.tostring(parallel) == ET.tostring(serial)
+
+
 def test_multi_root_files_reach_the_output(tmp_path):
     root = combine(tmp_path, {"m.xml": MULTI_ROOT})
     assert [c.tag for c in root] == ["one", "two"]
@@ -221,12 +312,99 @@ def test_a_malformed_file_is_parsed_once_and_not_retried(tmp_path, monkeypatch):
     assert len(calls) == 1
 
 
+def test_aggregate_cache_replays_after_the_input_folder_is_gone(tmp_path):
+    source = tmp_path / "in"
+    source.mkdir()
+    write(source, "a.xml", SINGLE_ROOT)
+    write(source, "m.xml", MULTI_ROOT)
+    shard = tmp_path / "inputs.shard"
+
+    first = tmp_path / "first.xml"
+    assert XMLCombiner(str(source), str(first), aggregate_cache=str(shard)).run() is True
+    shutil.rmtree(source)
+
+    second = tmp_path / "second.xml"
+    assert XMLCombiner(str(source), str(second), aggregate_cache=str(shard)).run() is True
+    assert second.read_bytes() == first.read_bytes()
+
+
+def test_fragment_cache_skips_reparsing_unchanged_files(tmp_path, monkeypatch):
+    import xml_combiner
+
+    source = tmp_path / "in"
+    source.mkdir()
+    write(source, "a.xml", SINGLE_ROOT)
+    write(source, "m.xml", MULTI_ROOT)
+    cache = tmp_path / "fragments.json"
+
+    first = tmp_path / "first.xml"
+    assert XMLCombiner(str(source), str(first), fragment_cache=str(cache)).run() is True
+
+    calls = []
+    real = xml_combiner.parse_roots
+
+    def counting(path):
+        calls.append(path)
+        return real(path)
+
+    monkeypatch.setattr(xml_combiner, "parse_roots", counting)
+
+    second = tmp_path / "second.xml"
+    assert XMLCombiner(str(source), str(second), fragment_cache=str(cache)).run() is True
+    assert calls == []
+    assert second.read_bytes() == first.read_bytes()
+
+
+def test_corrupt_fragment_cache_entries_fall_back_to_parsing(tmp_path):
+    source = tmp_path / "in"
+    source.mkdir()
+    write(source, "a.xml", SINGLE_ROOT)
+    write(source, "m.xml", MULTI_ROOT)
+    stat = (source / "m.xml").stat()
+    cache = tmp_path / "fragments.json"
+    cache.write_text(
+        json.dumps(
+            {
+                str(source / "a.xml"): 5,  # wrong shape entirely
+                # valid first fragment, corrupt second: the valid one must not
+                # reach the output twice when the file is re-parsed
+                str(source / "m.xml"): [
+                    stat.st_mtime_ns,
+                    stat.st_size,
+                    {},
+                    [["<one>first</one>", "\n"], ["<unclosed", None]],
+                ],
+            }
+        )
+    )
+
+    out = tmp_path / "out.xml"
+    combiner = XMLCombiner(str(source), str(out), fragment_cache=str(cache))
+    assert combiner.run() is True
+    assert combiner.processed_files == 2
+    assert [c.tag for c in ET.parse(out).getroot()] == ["root", "one", "two"]
+
+
 def test_empty_input_folder_reports_failure(tmp_path):
     source = tmp_path / "in"
     source.mkdir()
     assert XMLCombiner(str(source), str(tmp_path / "out.xml")).run() is False
 
 
+def test_a_failed_rerun_keeps_the_previous_output(tmp_path):
+    source = tmp_path / "in"
+    source.mkdir()
+    write(source, "a.xml", SINGLE_ROOT)
+    out = tmp_path / "out.xml"
+    assert XMLCombiner(str(source), str(out)).run() is True
+    before = out.read_bytes()
+
+    (source / "a.xml").unlink()
+    assert XMLCombiner(str(source), str(out)).run() is False
+    assert out.read_bytes() == before
+    assert list(tmp_path.glob("*.tmp")) == []
+
+
 def test_missing_input_folder_reports_failure(tmp_path):
     assert XMLCombiner(str(tmp_path / "nope"), str(tmp_path / "out.xml")).run() is False
 
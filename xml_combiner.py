@@ -14,43 +14,181 @@
 
 import hashlib
 import io
+import json
 import logging
+import mmap
+import os
 import re
+import struct
+import tempfile
 import xml.etree.ElementTree as ET
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from xml.etree.ElementTree import Element
 
 # defusedxml defends against entity-expansion ("billion laughs") and external-entity
-# DoS when parsing untrusted input. Drop-in replacements for the stdlib parsers.
-from defusedxml.ElementTree import fromstring as defused_fromstring
+# DoS when parsing untrusted input by hooking the DTD handlers of the parser.
+from defusedxml.ElementTree import DefusedXMLParser
 from defusedxml.ElementTree import iterparse as defused_iterparse
-from defusedxml.ElementTree import parse as defused_parse
+
+# lxml parses and serializes in C, which is an order of magnitude faster than the
+# stdlib parser on large corpora. It needs a compiled wheel that does not install
+# everywhere, so it stays an optional fast path, never a requirement.
+try:
+    from lxml import etree as _lxml
+
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
 
 logger = logging.getLogger(__name__)
 
-# Matches the XML declaration and a DOCTYPE at the start of a document. Both are
-# legal only at the top level, so they must come off before the text is wrapped.
-_PROLOG_RE = re.compile(r"\A\s*(?:<\?xml[^>]*\?>\s*)?(?:<!DOCTYPE[^>\[]*(?:\[[^\]]*\])?>\s*)?")
+if HAS_LXML:
+    # Entity resolution and network access stay off to keep parity with the
+    # defenses defusedxml applies on the fallback path. Comments and processing
+    # instructions are dropped because the stdlib parser discards them too.
+    _LXML_PARSER = _lxml.XMLParser(
+        resolve_entities=False,
+        no_network=True,
+        collect_ids=False,
+        remove_comments=True,
+        remove_pis=True,
+    )
+
+    def _fromstring(text):
+        """Parse a document, mapping lxml errors onto ET.ParseError."""
+        try:
+            return _lxml.fromstring(text, parser=_LXML_PARSER)
+        except _lxml.XMLSyntaxError as exc:
+            raise ET.ParseError(str(exc)) from exc
+
+    def _iterparse(source, events):
+        try:
+            yield from _lxml.iterparse(
+                source,
+                events=events,
+                resolve_entities=False,
+                no_network=True,
+                remove_comments=True,
+                remove_pis=True,
+            )
+        except _lxml.XMLSyntaxError as exc:
+            raise ET.ParseError(str(exc)) from exc
+
+    _new_element = _lxml.Element
+    _register_namespace = _lxml.register_namespace
+    _tostring = _lxml.tostring
+else:
+
+    def _defused_parser():
+        """DefusedXMLParser with the C-accelerated tree builder.
+
+        defusedxml loads the pure-Python XMLParser so it can hook the DTD
+        handlers, which also makes it build pure-Python Elements. Handing it
+        the stdlib TreeBuilder keeps the defenses on the parser while element
+        construction runs in C again.
+        """
+        return DefusedXMLParser(target=ET.TreeBuilder())
+
+    def _fromstring(text):
+        parser = _defused_parser()
+        parser.feed(text)
+        return parser.close()
+
+    _iterparse = defused_iterparse
+    _new_element = ET.Element
+    _register_namespace = ET.register_namespace
+    _tostring = ET.tostring
+
+# Matches a BOM, the XML declaration and a DOCTYPE at the start of a document.
+# All are legal only at the top level, so they must come off before the text is
+# wrapped. One pattern for decoded text, one for raw UTF-8 bytes.
+_PROLOG_RE = re.compile(r"\A﻿?\s*(?:<\?xml[^>]*\?>\s*)?(?:<!DOCTYPE[^>\[]*(?:\[[^\]]*\])?>\s*)?")
+_PROLOG_B_RE = re.compile(
+    rb"\A(?:\xef\xbb\xbf)?\s*(?:<\?xml[^>]*\?>\s*)?(?:<!DOCTYPE[^>\[]*(?:\[[^\]]*\])?>\s*)?"
+)
 _ENCODING_RE = re.compile(rb"\A\s*<\?xml[^>]*?encoding\s*=\s*[\"']([\w.-]+)[\"']")
 
+# Wide-encoding signatures: the UTF-32 BOMs first because the UTF-16 LE BOM is
+# a prefix of the UTF-32 LE one, then BOM-less documents recognized by how
+# "<?" comes out in each encoding.
+_WIDE_SIGNATURES = (
+    (b"\xff\xfe\x00\x00", "utf-32-le"),
+    (b"\x00\x00\xfe\xff", "utf-32-be"),
+    (b"\xff\xfe", "utf-16-le"),
+    (b"\xfe\xff", "utf-16-be"),
+    (b"<\x00\x00\x00", "utf-32-le"),
+    (b"\x00\x00\x00<", "utf-32-be"),
+    (b"<\x00?\x00", "utf-16-le"),
+    (b"\x00<\x00?", "utf-16-be"),
+)
+
+# Declared encodings whose bytes the parser can take as-is, no decode needed.
+_UTF8_COMPATIBLE = frozenset({"utf-8", "utf8", "us-ascii", "ascii"})
+
 WRAPPER_TAG = "__xml_combiner_wrapper__"
+_WRAPPER_TAG_B = WRAPPER_TAG.encode("ascii")
 
+# Below this size, setting up a memory map costs more than just reading.
+_MMAP_THRESHOLD = 16 * 1024
 
-def element_hash(element: Element) -> str:
-    """Content hash of an element, covering tag, text, attributes and children."""
 
-    def serialize(elem: Element) -> str:
-        parts = [f"{elem.tag}:{elem.text or ''}"]
-        parts.extend(f"{key}={value}" for key, value in sorted(elem.attrib.items()))
-        parts.extend(serialize(child) for child in elem)
-        return "|".join(parts)
+def element_hash(element: Element) -> bytes:
+    """Content digest of an element, covering tag, text, attributes and children.
 
-    # Not a security boundary, only duplicate detection.
-    return hashlib.md5(serialize(element).encode("utf-8"), usedforsecurity=False).hexdigest()
+    Attribute order and namespace-prefix spelling cannot produce different
+    digests for equal content, and the raw 32-byte digest comes back instead
+    of hex: it is the set-membership key, nothing more. On the lxml path the
+    element is serialized as Canonical XML (C14N 2.0) in C and then digested.
+    """
+    if HAS_LXML and isinstance(element, _lxml._Element):
+        return hashlib.sha256(_lxml.tostring(element, method="c14n2", with_tail=False)).digest()
+
+    # The stdlib canonicalizer is pure Python and re-parses the serialized
+    # fragment, so the fallback walks the tree itself with an explicit stack
+    # and streams straight into the digest: no recursion, no intermediate
+    # strings. ElementTree spells tags and attribute names as {uri}local, so
+    # the result is independent of prefix choice without canonicalizing. Text
+    # after a child's end tag counts too - c14n2 on the lxml path includes
+    # it, and both branches must agree on what equal content means - while
+    # the hashed element's own tail stays out, matching with_tail=False.
+    digest = hashlib.sha256()
+    update = digest.update
+    stack: list[Element | bytes] = [element]
+    while stack:
+        elem = stack.pop()
+        if isinstance(elem, bytes):  # close marker, with any tail behind it
+            update(elem)
+            continue
+        update(b"(")
+        update(elem.tag.encode("utf-8"))
+        update(b"\x00")
+        if elem.text:
+            update(elem.text.encode("utf-8"))
+        for key in sorted(elem.attrib):
+            update(b"\x00")
+            update(key.encode("utf-8"))
+            update(b"=")
+            update(elem.attrib[key].encode("utf-8"))
+        tail = elem.tail if elem is not element else None
+        stack.append(b")" + tail.encode("utf-8") if tail else b")")
+        stack.extend(reversed(elem))
+    return digest.digest()
 
 
 def declared_encoding(raw: bytes) -> str:
-    """Encoding named in the XML declaration, or utf-8 when it does not say."""
+    """Encoding of a document: BOM or wide signature first, then the declaration.
+
+    The declaration regex only reads ASCII-compatible bytes, so UTF-16 and
+    UTF-32 documents have to be recognized from their BOM - or, without one,
+    from how "<?" is spelled in each encoding - before the regex runs.
+    Defaults to utf-8 when nothing says otherwise.
+    """
+    head = bytes(raw[:4])
+    for signature, encoding in _WIDE_SIGNATURES:
+        if head.startswith(signature):
+            return encoding
     match = _ENCODING_RE.match(raw)
     return match.group(1).decode("ascii") if match else "utf-8"
 
@@ -58,28 +196,122 @@ def declared_encoding(raw: bytes) -> str:
 def parse_roots(xml_file: Path) -> tuple[list[Element], dict[str, str]]:
     """Read one XML file and return its root elements and namespace prefixes.
 
-    A well-formed document has exactly one root. Files with several top-level
-    elements are not valid XML and ElementTree refuses them outright, so they are
-    re-read and parsed inside a synthetic wrapper element. Both cases come back
-    as a list, which lets the caller treat them the same way.
+    The file is read exactly once; every parse below works from that buffer,
+    so the roots pass, the namespace scan, and the multi-root fallback cost no
+    further syscalls. Large files are memory-mapped, which lets the parser
+    work straight off the page cache instead of a user-space copy; small ones
+    are read outright because the map setup would cost more than the copy.
     """
-    try:
-        roots = [defused_parse(xml_file).getroot()]
-        prefixes = _namespace_prefixes(xml_file)
-    except ET.ParseError:
-        raw = xml_file.read_bytes()
-        body = _PROLOG_RE.sub("", raw.decode(declared_encoding(raw), errors="replace"))
-        wrapped = f"<{WRAPPER_TAG}>{body}</{WRAPPER_TAG}>"
-        roots = list(defused_fromstring(wrapped))
-        if len(roots) > 1:
-            logger.warning("%s has %d root elements, keeping all of them", xml_file.name, len(roots))
-        prefixes = _namespace_prefixes(io.BytesIO(wrapped.encode("utf-8")))
+    with xml_file.open("rb") as handle:
+        if os.fstat(handle.fileno()).st_size < _MMAP_THRESHOLD:
+            return _parse_roots_data(handle.read(), xml_file.name)
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            return _parse_roots_data(view, xml_file.name)
+
+
+def _parse_roots_data(raw: bytes | mmap.mmap, name: str) -> tuple[list[Element], dict[str, str]]:
+    """Parse one document from memory; the name is only used for logging.
+
+    The document is parsed exactly once: the body goes inside a synthetic
+    wrapper element, and a single iterparse pass collects the namespace
+    prefixes and the top-level elements together. The wrapper also means that
+    files with several top-level elements - not valid XML on their own -
+    parse like any other file, so there is no second parse to detect them.
+
+    A cheap scan of the declaration decides how to wrap. When the declared
+    encoding is UTF-8-compatible - nearly every file - the prolog comes off
+    at the byte level and the parser gets the original bytes; only other
+    encodings pay the decode and re-encode round trip.
+    """
+    encoding = declared_encoding(raw)
+    if encoding.lower() in _UTF8_COMPATIBLE:
+        body = raw[_PROLOG_B_RE.match(raw).end() :]
+        wrapped = b"<" + _WRAPPER_TAG_B + b">" + body + b"</" + _WRAPPER_TAG_B + b">"
+        try:
+            return _scan_wrapped(wrapped, name)
+        except ET.ParseError:
+            # Mis-declared or malformed bytes get the tolerant decode below.
+            logger.debug("Retrying %s with tolerant decoding", name)
+
+    body = _PROLOG_RE.sub("", str(raw, encoding, "replace"))
+    return _scan_wrapped(f"<{WRAPPER_TAG}>{body}</{WRAPPER_TAG}>".encode(), name)
+
+
+def _scan_wrapped(wrapped: bytes, name: str) -> tuple[list[Element], dict[str, str]]:
+    """One iterparse pass over a wrapped document: roots and prefixes together."""
+    roots: list[Element] = []
+    prefixes: dict[str, str] = {}
+    depth = 0
+    add_root = roots.append  # bound once; this loop runs per parser event
+    for event, data in _iterparse(io.BytesIO(wrapped), ("start", "end", "start-ns")):
+        if event == "start":
+            depth += 1
+        elif event == "end":
+            depth -= 1
+            if depth == 1:  # a child of the wrapper, fully built
+                add_root(data)
+        else:
+            prefixes[data[0] or ""] = data[1]
+
+    if len(roots) > 1:
+        logger.warning("%s has %d root elements, keeping all of them", name, len(roots))
     return roots, prefixes
 
 
-def _namespace_prefixes(source) -> dict[str, str]:
-    """Prefix to URI map from a document. iterparse yields (event, data) pairs."""
-    return {prefix: uri for _, (prefix, uri) in defused_iterparse(source, events=("start-ns",))}
+def _read_shard_record(view, offset: int) -> tuple[str, bytes, int]:
+    """Decode one ``<name_len><data_len><name><data>`` record, return next offset."""
+    name_len, data_len = struct.unpack_from("<QQ", view, offset)
+    offset += 16
+    name = view[offset : offset + name_len].decode("utf-8")
+    offset += name_len
+    return name, view[offset : offset + data_len], offset + data_len
+
+
+def _parse_file_worker(path: str) -> tuple[list[tuple[bytes, str | None]], dict[str, str]]:
+    """Parse one file in a worker process.
+
+    Elements do not pickle, so the roots travel back to the parent as
+    serialized bytes and are rebuilt there. The tail goes separately: left in
+    place it would end up inside the fragment, which the parent's re-parse
+    then rejects as trailing content.
+    """
+    roots, prefixes = parse_roots(Path(path))
+    fragments = []
+    for root in roots:
+        tail, root.tail = root.tail, None
+        try:
+            fragments.append((_tostring(root), tail))
+        finally:
+            root.tail = tail
+    return fragments, prefixes
+
+
+class _BloomFilter:
+    """Fixed-memory set of element_hash digests with approximate membership.
+
+    A false positive makes the combiner drop a genuinely new element, which
+    is why this only ever backs the explicit --dedup-approximate opt-in. At
+    the default size (8 MiB, 7 probes) the false-positive rate stays far
+    below 0.1% for tens of millions of elements, where the exact set would
+    cost gigabytes. The 32-byte digest already carries plenty of entropy, so
+    the probe positions are sliced out of it instead of rehashing.
+    """
+
+    def __init__(self, bits: int = 1 << 26, probes: int = 7):
+        self._mask = bits - 1  # bits must be a power of two
+        self._probes = probes
+        self._bitmap = bytearray(bits // 8)
+
+    def _positions(self, digest: bytes):
+        for i in range(self._probes):
+            yield int.from_bytes(digest[4 * i : 4 * i + 4], "little") & self._mask
+
+    def add(self, digest: bytes) -> None:
+        for pos in self._positions(digest):
+            self._bitmap[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, digest: bytes) -> bool:
+        return all(self._bitmap[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(digest))
 
 
 class XMLCombiner:
@@ -93,8 +325,12 @@ class XMLCombiner:
         recursive: bool = False,
         validate_schema: str | None = None,
         deduplicate: bool = False,
+        approximate_dedup: bool = False,
         preserve_structure: bool = True,
         max_retries: int = 3,
+        jobs: int = 1,
+        aggregate_cache: str | None = None,
+        fragment_cache: str | None = None,
     ):
         self.input_folder = Path(input_folder)
         self.output_file = Path(output_file)
@@ -104,10 +340,30 @@ class XMLCombiner:
         self.deduplicate = deduplicate
         self.preserve_structure = preserve_structure
         self.max_retries = max_retries
-
-        self.combined_root = ET.Element(root_element_name)
-        self.seen_elements: set[str] = set()
+        self.jobs = jobs
+        self.aggregate_cache = Path(aggregate_cache) if aggregate_cache else None
+        self.fragment_cache = Path(fragment_cache) if fragment_cache else None
+        self._fragments_by_path: dict = {}
+
+        self.combined_root = _new_element(root_element_name)
+        # Where accepted elements go. The streaming path points these at the
+        # incremental writer for the duration of a run. _extend takes a batch,
+        # so the flatten path pays one amortized list growth per file instead
+        # of one call per element.
+        self._append = self.combined_root.append
+        self._extend = self.combined_root.extend
+        self.seen_elements: set[bytes] | _BloomFilter = (
+            _BloomFilter() if deduplicate and approximate_dedup else set()
+        )
         self.namespace_map: dict[str, str] = {}
+        # Inverse of namespace_map, kept so a URI membership check is one dict
+        # lookup instead of a scan over the values.
+        self._uri_to_prefix: dict[str, str] = {}
+        # deduplicate and preserve_structure are constant for the whole run,
+        # so the per-element branches on them are resolved here, once, rather
+        # than on every call.
+        self._is_new = self._is_new_hashed if deduplicate else self._is_new_always
+        self._add_root = self._add_root_whole if preserve_structure else self._add_root_children
         self.processed_files = 0
         self.failed_files = 0
 
@@ -120,24 +376,68 @@ class XMLCombiner:
             return False
         return True
 
+    def _iter_xml_files(self) -> Iterator[Path]:
+        """XML files in path order, yielded while the walk is still running.
+
+        os.scandir reports each entry's type from the directory read itself,
+        so unlike pathlib's is_file() there is no extra stat syscall per
+        entry - the main cost on directories with very many files. A
+        directory is read only when the walk reaches it, and only the
+        entries of the directories on the current path are held in memory,
+        so the first file comes back before a large tree has been fully
+        enumerated.
+        """
+
+        def walk(directory: str) -> Iterator[str]:
+            files: list[str] = []
+            subdirs: list[str] = []
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            if self.recursive:
+                                # The separator suffix sorts a subtree exactly
+                                # where its paths fall among sibling files.
+                                subdirs.append(entry.path + os.sep)
+                        else:
+                            name = entry.name.lower()
+                            if name.endswith(".xml") and name != ".xml" and entry.is_file():
+                                files.append(entry.path)
+            except OSError as error:
+                # An unreadable directory costs its own subtree, not the run.
+                logger.warning("Skipping unreadable directory %s: %s", directory, error)
+            for item in sorted(files + subdirs):
+                if item.endswith(os.sep):
+                    yield from walk(item[:-1])
+                else:
+                    yield item
+
+        for path in walk(str(self.input_folder)):
+            yield Path(path)
+
     def get_xml_files(self) -> list[Path]:
         """XML files in the input folder, optionally including subdirectories."""
-        entries = self.input_folder.rglob("*") if self.recursive else self.input_folder.iterdir()
-        xml_files = sorted(p for p in entries if p.is_file() and p.suffix.lower() == ".xml")
+        xml_files = list(self._iter_xml_files())
         logger.info("Found %d XML files", len(xml_files))
         return xml_files
 
     def _register_prefixes(self, prefixes: dict[str, str]) -> None:
-        """Keep the prefix names the inputs used, instead of ET's ns0, ns1, ns2."""
+        """Keep the prefix names the inputs used, instead of ET's ns0, ns1, ns2.
+
+        Only the maps are updated here. register_namespace mutates a global
+        registry behind a module lock, so it runs once per unique prefix in
+        save_combined_xml, right before writing, not once per file.
+        """
         for prefix, uri in prefixes.items():
-            if uri not in self.namespace_map.values():
-                self.namespace_map[prefix or ""] = uri
-                ET.register_namespace(prefix or "", uri)
+            if uri not in self._uri_to_prefix:
+                self._uri_to_prefix[uri] = prefix
+                self.namespace_map[prefix] = uri
 
-    def _is_new(self, element: Element) -> bool:
-        """False when deduplication is on and this element was already added."""
-        if not self.deduplicate:
-            return True
+    def _is_new_always(self, element: Element) -> bool:
+        return True
+
+    def _is_new_hashed(self, element: Element) -> bool:
+        """False when an element with this content was already added."""
         digest = element_hash(element)
         if digest in self.seen_elements:
             logger.debug("Skipping duplicate element: %s", element.tag)
@@ -145,18 +445,23 @@ class XMLCombiner:
         self.seen_elements.add(digest)
         return True
 
-    def _add_root(self, root: Element) -> None:
-        """Append one parsed root, honoring preserve_structure and deduplication."""
-        candidates = [root] if self.preserve_structure else list(root)
-        for element in candidates:
-            if self._is_new(element):
-                self.combined_root.append(element)
+    def _add_root_whole(self, root: Element) -> None:
+        """Append one parsed root as-is (preserve_structure)."""
+        if self._is_new(root):
+            self._append(root)
+
+    def _add_root_children(self, root: Element) -> None:
+        """Append the root's direct children, dropping the root (--flatten)."""
+        fresh = [element for element in root if self._is_new(element)]
+        if fresh:
+            self._extend(fresh)
 
     def _validate_xml(self, xml_file: Path) -> bool:
         """Well-formedness gate for --validate-schema.
 
-        Full XSD validation needs lxml, which this project deliberately avoids.
-        The schema path is therefore only a switch that turns the check on.
+        Full XSD validation needs lxml, which is only an optional extra here.
+        The schema path is therefore only a switch that turns the check on,
+        and the check behaves the same with and without the fast path.
         """
         if not self.validate_schema:
             return True
@@ -182,6 +487,17 @@ class XMLCombiner:
         if not self._validate_xml(xml_file):
             return False
 
+        cached = self._cached_fragments(xml_file)
+        if cached is not None:
+            try:
+                self._replay_fragments(*cached)
+            except (ET.ParseError, TypeError, ValueError, AttributeError):
+                # A corrupt cache entry is not worth failing the file over;
+                # the parse below rebuilds it from the source.
+                logger.warning("Ignoring corrupt fragment cache entry for %s", xml_file.name)
+            else:
+                return True
+
         for attempt in range(1, self.max_retries + 1):
             try:
                 roots, prefixes = parse_roots(xml_file)
@@ -198,6 +514,8 @@ class XMLCombiner:
                 logger.exception("Malformed XML in %s", xml_file.name)
                 return False
 
+            if self.fragment_cache is not None:
+                self._store_fragments(xml_file, roots, prefixes)
             self._register_prefixes(prefixes)
             for root in roots:
                 self._add_root(root)
@@ -205,31 +523,238 @@ class XMLCombiner:
 
         return False
 
-    def combine_xml_files(self) -> bool:
-        if not self.validate_paths():
+    def _cached_fragments(self, xml_file: Path):
+        """Cached (prefixes, fragments) while the file is unchanged, else None."""
+        if self.fragment_cache is None:
+            return None
+        entry = self._fragments_by_path.get(str(xml_file))
+        if entry is None:
+            return None
+        try:
+            stat = xml_file.stat()
+        except OSError:
+            return None
+        try:
+            mtime_ns, size, prefixes, fragments = entry
+        except (TypeError, ValueError):
+            # The cache is untrusted input; an entry of the wrong shape is
+            # treated like a miss, not a crash.
+            logger.warning("Ignoring corrupt fragment cache entry for %s", xml_file.name)
+            return None
+        if (mtime_ns, size) != (stat.st_mtime_ns, stat.st_size):
+            return None
+        logger.debug("Fragment cache hit: %s", xml_file.name)
+        return prefixes, fragments
+
+    def _replay_fragments(self, prefixes: dict[str, str], fragments: list) -> None:
+        """Rebuild a cached file's roots without re-reading or re-wrapping it."""
+        roots = []
+        for fragment, tail in fragments:
+            root = _fromstring(fragment.encode("utf-8"))
+            root.tail = tail
+            roots.append(root)
+        # Nothing reaches the combined tree until every fragment parsed: an
+        # added root cannot be taken back from the streaming sink, and the
+        # re-parse after a corrupt entry must not duplicate the early roots.
+        self._register_prefixes(prefixes)
+        for root in roots:
+            self._add_root(root)
+
+    def _store_fragments(self, xml_file: Path, roots: list[Element], prefixes: dict[str, str]) -> None:
+        """Remember this file's parsed roots, keyed by its size and mtime.
+
+        The cache is JSON holding XML text, not pickle: a cache file is just
+        more untrusted on-disk input, so replaying it goes back through the
+        hardened parser like everything else.
+        """
+        try:
+            stat = xml_file.stat()
+        except OSError:
+            return
+        fragments = []
+        for root in roots:
+            # Serializers disagree on whether the tail belongs to the
+            # fragment, so it is parked and stored separately.
+            tail, root.tail = root.tail, None
+            try:
+                fragments.append([_tostring(root, encoding="unicode"), tail])
+            finally:
+                root.tail = tail
+        self._fragments_by_path[str(xml_file)] = [stat.st_mtime_ns, stat.st_size, prefixes, fragments]
+
+    def _load_fragment_cache(self) -> None:
+        if self.fragment_cache is None or not self.fragment_cache.exists():
+            return
+        try:
+            self._fragments_by_path = json.loads(self.fragment_cache.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            logger.warning("Ignoring unreadable fragment cache %s", self.fragment_cache)
+            self._fragments_by_path = {}
+
+    def _save_fragment_cache(self) -> None:
+        if self.fragment_cache is None:
+            return
+        try:
+            self.fragment_cache.parent.mkdir(parents=True, exist_ok=True)
+            self.fragment_cache.write_text(json.dumps(self._fragments_by_path), encoding="utf-8")
+        except OSError:
+            logger.exception("Cannot write fragment cache %s", self.fragment_cache)
+
+    def _process_xml_data(self, name: str, raw: bytes) -> bool:
+        """Parse one in-memory document into the combined tree."""
+        try:
+            roots, prefixes = _parse_roots_data(raw, name)
+        except ET.ParseError:
+            logger.exception("Malformed XML in %s", name)
             return False
+        self._register_prefixes(prefixes)
+        for root in roots:
+            self._add_root(root)
+        return True
 
-        xml_files = self.get_xml_files()
-        if not xml_files:
-            logger.warning("No XML files found to process")
+    def _write_shard(self, xml_files: list[Path], shard: Path) -> bool:
+        """Concatenate every input into one length-prefixed shard file."""
+        logger.info("Building aggregate cache %s from %d files", shard, len(xml_files))
+        try:
+            shard.parent.mkdir(parents=True, exist_ok=True)
+            with shard.open("wb") as out:
+                for xml_file in xml_files:
+                    name = xml_file.name.encode("utf-8")
+                    raw = xml_file.read_bytes()
+                    out.write(struct.pack("<QQ", len(name), len(raw)))
+                    out.write(name)
+                    out.write(raw)
+        except OSError:
+            logger.exception("Cannot build aggregate cache %s", shard)
+            shard.unlink(missing_ok=True)
             return False
+        return True
+
+    def _combine_from_shard(self, shard: Path) -> bool:
+        """Combine from an aggregate shard instead of the input directory.
 
+        The shard is memory-mapped and its records parsed in place, so a rerun
+        opens a single file no matter how many inputs went into the shard.
+        """
+        logger.info("Reading aggregated inputs from %s", shard)
         self.processed_files = 0
         self.failed_files = 0
+        total = 0
+        try:
+            with shard.open("rb") as handle, mmap.mmap(
+                handle.fileno(), 0, access=mmap.ACCESS_READ
+            ) as view:
+                offset = 0
+                while offset < len(view):
+                    name, raw, offset = _read_shard_record(view, offset)
+                    total += 1
+                    if self._process_xml_data(name, raw):
+                        self.processed_files += 1
+                    else:
+                        self.failed_files += 1
+        except (OSError, ValueError, struct.error):
+            logger.exception("Cannot read aggregate cache %s", shard)
+            return False
+
+        logger.info("Successfully processed %d of %d files", self.processed_files, total)
+        if self.failed_files:
+            logger.warning("Failed to process %d files", self.failed_files)
+        return self.processed_files > 0
 
+    def _combine_serial(self, xml_files: Iterable[Path]) -> int:
+        """Process files one by one; returns how many the iterable yielded."""
+        total = 0
+        process = self._process_xml_file
         for xml_file in xml_files:
-            if self._process_xml_file(xml_file):
+            total += 1
+            if process(xml_file):
                 self.processed_files += 1
                 logger.debug("Processed file: %s", xml_file.name)
             else:
                 self.failed_files += 1
+        return total
+
+    def combine_xml_files(self) -> bool:
+        if self.aggregate_cache is not None and self.aggregate_cache.exists():
+            return self._combine_from_shard(self.aggregate_cache)
+
+        if not self.validate_paths():
+            return False
+
+        self._load_fragment_cache()
+        self.processed_files = 0
+        self.failed_files = 0
+
+        if self.aggregate_cache is not None:
+            xml_files = self.get_xml_files()
+            if xml_files and self._write_shard(xml_files, self.aggregate_cache):
+                return self._combine_from_shard(self.aggregate_cache)
+            total = self._combine_serial(xml_files)
+        elif self.jobs != 1:
+            xml_files = self.get_xml_files()
+            if len(xml_files) > 1:
+                self._combine_parallel(xml_files)
+                total = len(xml_files)
+            else:
+                total = self._combine_serial(xml_files)
+        else:
+            # Straight off the walker: the first file parses while enumeration
+            # of a large tree is still running, and the full list never exists.
+            total = self._combine_serial(self._iter_xml_files())
 
-        logger.info("Successfully processed %d of %d files", self.processed_files, len(xml_files))
+        if total == 0:
+            logger.warning("No XML files found to process")
+            return False
+
+        self._save_fragment_cache()
+        logger.info("Successfully processed %d of %d files", self.processed_files, total)
         if self.failed_files:
             logger.warning("Failed to process %d files", self.failed_files)
 
         return self.processed_files > 0
 
+    def _combine_parallel(self, xml_files: list[Path]) -> None:
+        """Parse files in worker processes and merge the results in order.
+
+        Parsing dominates runtime and each file is independent, so this scales
+        with cores. The parent merges in submission order, which keeps the
+        output byte-identical to a serial run.
+        """
+        max_workers = self.jobs if self.jobs > 0 else os.cpu_count()
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(_parse_file_worker, str(p)) for p in xml_files]
+            for xml_file, future in zip(xml_files, futures, strict=True):
+                if self._merge_worker_result(xml_file, future):
+                    self.processed_files += 1
+                    logger.debug("Processed file: %s", xml_file.name)
+                else:
+                    self.failed_files += 1
+
+    def _merge_worker_result(self, xml_file: Path, future) -> bool:
+        if not self._validate_xml(xml_file):
+            return False
+        try:
+            fragments, prefixes = future.result()
+        except ET.ParseError:
+            logger.exception("Malformed XML in %s", xml_file.name)
+            return False
+        except OSError:
+            # A transient read error gets the serial path and its retry loop.
+            return self._process_xml_file(xml_file)
+
+        self._register_prefixes(prefixes)
+        try:
+            for fragment, tail in fragments:
+                root = _fromstring(fragment)
+                root.tail = tail
+                self._add_root(root)
+        except ET.ParseError:
+            # A fragment that does not survive the round trip is one failed
+            # file, not a reason to abort the whole run.
+            logger.exception("Worker result for %s did not parse", xml_file.name)
+            return False
+        return True
+
     def _resolve_safe_output(self) -> Path | None:
         """Resolve the output path, rejecting relative-path traversal.
 
@@ -262,10 +787,14 @@ class XMLCombiner:
         try:
             self.output_file.parent.mkdir(parents=True, exist_ok=True)
             for prefix, uri in self.namespace_map.items():
-                ET.register_namespace(prefix, uri)
-            ET.ElementTree(self.combined_root).write(
-                self.output_file, encoding="utf-8", xml_declaration=True, method="xml"
-            )
+                # lxml keeps default namespaces on the elements' own nsmap and
+                # rejects an empty prefix here, so only named prefixes register.
+                if prefix or not HAS_LXML:
+                    _register_namespace(prefix, uri)
+            # One bulk serialization and one write call, instead of funneling
+            # many small per-element writes through the buffered io stack.
+            payload = _tostring(self.combined_root, encoding="utf-8", xml_declaration=True)
+            self.output_file.write_bytes(payload)
         except OSError:
             logger.exception("Error saving file %s", self.output_file)
             return False
@@ -273,5 +802,67 @@ class XMLCombiner:
             logger.info("Combined XML file saved: %s", self.output_file)
             return True
 
+    def _run_streaming(self) -> bool:
+        """Combine and write in one pass through lxml's incremental writer.
+
+        Every accepted element is serialized the moment its file is parsed, so
+        peak memory is one input tree instead of the sum of all of them, and
+        there is no second serialization pass over a combined tree.
+        """
+        replaying = self.aggregate_cache is not None and self.aggregate_cache.exists()
+        if not replaying and not self.validate_paths():
+            return False
+        safe_output = self._resolve_safe_output()
+        if safe_output is None:
+            return False
+        self.output_file = safe_output
+
+        temp_output = None
+        try:
+            self.output_file.parent.mkdir(parents=True, exist_ok=True)
+            # Stream into a sibling temp file and move it over the target only
+            # on success: opening the target itself would truncate a previous
+            # good output before the new combine is known to succeed.
+            with tempfile.NamedTemporaryFile(
+                dir=self.output_file.parent, suffix=".tmp", delete=False
+            ) as handle:
+                temp_output = Path(handle.name)
+            with _lxml.xmlfile(str(temp_output), encoding="utf-8") as xmlfile:
+                xmlfile.write_declaration()
+                with xmlfile.element(self.root_element_name):
+
+                    def write_all(elements, write=xmlfile.write):
+                        for element in elements:
+                            write(element)
+
+                    self._append = xmlfile.write
+                    self._extend = write_all
+                    try:
+                        combined = self.combine_xml_files()
+                    finally:
+                        self._append = self.combined_root.append
+                        self._extend = self.combined_root.extend
+            if combined:
+                temp_output.replace(self.output_file)
+                temp_output = None
+        except OSError:
+            # combine_xml_files handles its own input-side errors, so an
+            # OSError reaching this handler came from the writer: opening the
+            # output, a write through the sinks, or closing it.
+            logger.exception("Error writing output file %s", self.output_file)
+            return False
+        finally:
+            if temp_output is not None:
+                temp_output.unlink(missing_ok=True)
+
+        if not combined:
+            return False
+        logger.info("Combined XML file saved: %s", self.output_file)
+        return True
+
     def run(self) -> bool:
+        if HAS_LXML:
+            return self._run_streaming()
+        # The stdlib has no incremental writer, so the fallback keeps the
+        # two-step combine-then-save model.
         return self.combine_xml_files() and self.save_combined_xml()